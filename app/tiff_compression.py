@@ -1,5 +1,6 @@
 import tifffile
 import os
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
 from pathlib import Path
 from .compression_check import check_compression
 
@@ -53,22 +54,47 @@ class TiffCompressor:
         self.input_path = Path(input_path)
         self.original_size = os.path.getsize(input_path)
 
-    def compress_with_tifffile(self, output_path, method='lzw'):
+    def compress_with_tifffile(self, output_path, method='lzw', return_data=False):
         """
         Compress using tifffile library.
         Better for multi-frame TIFF sequences.
+
+        With return_data=True, returns (stats, data) where data is the
+        decoded pixel array, so callers can verify the written file against
+        it without decoding the original a second time. This keeps the full
+        stack in memory; the default streams page by page instead.
         """
         try:
             with tifffile.TiffFile(self.input_path) as tif:
-                data = tif.asarray()
                 metadata = tif.imagej_metadata
-
-            tifffile.imwrite(output_path,
-                             data,
-                             compression=self.COMPRESSION_METHODS[method]['tifffile_method'],
-                             metadata=metadata,
-                             imagej=True if metadata else False)
-            return self._get_compression_stats(output_path)
+                series = tif.series[0]
+                write_kwargs = {
+                    'compression': self.COMPRESSION_METHODS[method]['tifffile_method'],
+                    'metadata': metadata,
+                    'imagej': True if metadata else False,
+                    'bigtiff': tif.is_bigtiff,
+                }
+
+                if return_data:
+                    # Memory-mapped output keeps the decode out of the heap
+                    # allocator; the array is still usable for writing and
+                    # for verification afterwards.
+                    data = tif.asarray(out='memmap')
+                    tifffile.imwrite(output_path, data, **write_kwargs)
+                else:
+                    # Stream page by page instead of materializing the whole
+                    # stack with asarray(); peak memory stays at one page
+                    # even for stacks larger than RAM.
+                    data = None
+                    pages = (page.asarray() for page in tif.pages)
+                    tifffile.imwrite(output_path,
+                                     pages,
+                                     shape=series.shape,
+                                     dtype=series.dtype,
+                                     **write_kwargs)
+
+            stats = self._get_compression_stats(output_path)
+            return (stats, data) if return_data else stats
         except Exception as e:
             raise Exception(f"Tiff file compression failed: {str(e)}")
 
@@ -84,31 +110,80 @@ class TiffCompressor:
         }
 
 
+def iter_tiff_files(root, recursive=False):
+    """
+    Yield paths of .tif/.tiff files under root.
+
+    Uses os.scandir (or os.walk when recursive), which reuses the directory
+    entry's type information instead of the extra stat calls and eager Path
+    construction Path.glob performs on large directories.
+    """
+    if recursive:
+        for dirpath, _, filenames in os.walk(root, followlinks=False):
+            for name in filenames:
+                if name.lower().endswith(('.tif', '.tiff')):
+                    yield os.path.join(dirpath, name)
+    else:
+        with os.scandir(root) as entries:
+            for entry in entries:
+                if entry.is_file() and entry.name.lower().endswith(('.tif', '.tiff')):
+                    yield entry.path
+
+
+def _compressed_name(file, compression_type):
+    """Return the output path for a compressed copy of file."""
+    folder = os.path.abspath(os.path.join(file, os.pardir))
+    name = os.path.join(folder, os.path.splitext(os.path.basename(file))[0])
+    return name + '_' + compression_type + ".tif"
+
+
+def _compress_one(input_path, output_dir, method):
+    """
+    Compress a single file into output_dir.
+    Module-level so it can be pickled into worker processes.
+    """
+    input_path = Path(input_path)
+    compressor = TiffCompressor(input_path)
+    output_path = Path(output_dir) / f"_{input_path.name}"
+
+    stats = compressor.compress_with_tifffile(output_path, method)
+    stats['filename'] = input_path.name
+    return stats
+
+
 class TiffCompressorManager:
     def __init__(self, path):
         self.path = path
 
     @classmethod
-    def batch_compress_directory(cls, input_dir, output_dir, method='lzw'):
+    def batch_compress_directory(cls, input_dir, output_dir, method='lzw', max_workers=None):
         """
         Batch compress all TIFF files in a directory.
+
+        Files are independent, so they are compressed in parallel across
+        processes (one per core by default). Falls back to threads where
+        spawning processes is not allowed.
         """
         input_dir = Path(input_dir)
         output_dir = Path(output_dir)
         output_dir.mkdir(exist_ok=True)
 
-        results = []
-        for tiff_file in input_dir.glob('*.tif*'):
-            try:
-                compressor = TiffCompressor(tiff_file)
-                output_path = output_dir / f"_{tiff_file.name}"
-
-                stats = compressor.compress_with_tifffile(output_path, method)
+        try:
+            executor = ProcessPoolExecutor(max_workers=max_workers or os.cpu_count())
+        except (OSError, ValueError):
+            executor = ThreadPoolExecutor(max_workers=max_workers or os.cpu_count())
 
-                stats['filename'] = tiff_file.name
-                results.append(stats)
-            except Exception as e:
-                print(f"Error processing {tiff_file}: {str(e)}")
+        results = []
+        with executor:
+            futures = {
+                executor.submit(_compress_one, tiff_file, str(output_dir), method): tiff_file
+                for tiff_file in iter_tiff_files(input_dir)
+            }
+            for future in as_completed(futures):
+                try:
+                    results.append(future.result())
+                except Exception as e:
+                    print(f"Error processing {futures[future]}: {str(e)}")
         return results
 
     @classmethod
@@ -129,10 +204,8 @@ class TiffCompressorManager:
         
         if skip_if_compressed and is_compressed:
             return file, True, existing_method
-        
-        folder = os.path.abspath(os.path.join(file, os.pardir))
-        name = os.path.join(folder, os.path.splitext(os.path.basename(file))[0])
-        compressed_name = name + '_' + compression_type + ".tif"
+
+        compressed_name = _compressed_name(file, compression_type)
 
         # For a single file
         compressor = TiffCompressor(file)
@@ -140,9 +213,21 @@ class TiffCompressorManager:
         return compressed_name, False, None
 
     @classmethod
-    def compress_and_check(cls, file):
-        compressed_filename = cls.compress_file(file)
-        check_compression(file, compressed_filename)
+    def compress_and_check(cls, file, compression_type='zip'):
+        """
+        Compress a file and verify the result, keeping the decoded original
+        in memory so verification only re-reads the compressed file.
+        """
+        is_compressed, existing_method = is_already_compressed(file)
+        if is_compressed:
+            return file, True, existing_method
+
+        compressed_name = _compressed_name(file, compression_type)
+        compressor = TiffCompressor(file)
+        _, data = compressor.compress_with_tifffile(
+            compressed_name, method=compression_type, return_data=True)
+        check_compression(file, compressed_name, original_array=data)
+        return compressed_name, False, None
 
 
 
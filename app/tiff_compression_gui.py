@@ -1,8 +1,9 @@
 import tkinter as tk
 from tkinter import ttk, filedialog, messagebox
 import os
-from pathlib import Path
-from .tiff_compression import TiffCompressorManager
+import queue
+import threading
+from .tiff_compression import TiffCompressorManager, iter_tiff_files
 from .compression_check import check_compression
 
 
@@ -60,6 +61,11 @@ class TiffCompressorGUI:
         self.root.rowconfigure(0, weight=1)
         main_frame.columnconfigure(1, weight=1)
 
+        # Worker thread state: compression runs off the Tk main thread and
+        # reports back through this queue, drained periodically via after().
+        self._queue = queue.Queue()
+        self._worker = None
+
     def select_file(self):
         filename = filedialog.askopenfilename(
             filetypes=[("TIFF files", "*.tif *.tiff"), ("All files", "*.*")]
@@ -78,26 +84,61 @@ class TiffCompressorGUI:
             messagebox.showerror("Error", "Please select a file or folder first")
             return
 
+        if self._worker is not None and self._worker.is_alive():
+            messagebox.showinfo("Busy", "A compression job is already running")
+            return
+
         self.results_text.delete(1.0, tk.END)
         self.progress_var.set("Processing...")
         self.progress_bar['value'] = 0
-        self.root.update()
 
+        self._worker = threading.Thread(target=self._run_compress, args=(path,), daemon=True)
+        self._worker.start()
+        self.root.after(50, self._drain_queue)
+
+    def _run_compress(self, path):
+        """Worker-thread entry point; only talks to Tk through the queue."""
         try:
             if os.path.isfile(path):
                 self.compress_single_file(path)
             else:
                 self.compress_folder(path)
-
-            self.progress_var.set("Compression completed!")
-            self.progress_bar['value'] = 100
-            messagebox.showinfo("Success", "Compression completed successfully!")
-
+            self._queue.put(('done', None))
         except Exception as e:
-            self.progress_var.set("Error occurred!")
-            messagebox.showerror("Error", f"An error occurred: {str(e)}")
-
-        self.root.update()
+            self._queue.put(('error', str(e)))
+
+    def _drain_queue(self):
+        """Apply queued worker updates on the Tk main thread."""
+        while True:
+            try:
+                kind, payload = self._queue.get_nowait()
+            except queue.Empty:
+                break
+
+            if kind == 'log':
+                self.results_text.insert(tk.END, payload)
+                self.results_text.see(tk.END)
+            elif kind == 'progress':
+                self.progress_bar['value'] = payload
+            elif kind == 'mode':
+                self.progress_bar.configure(mode=payload)
+                if payload == 'indeterminate':
+                    self.progress_bar.start(10)
+                else:
+                    self.progress_bar.stop()
+            elif kind == 'status':
+                self.progress_var.set(payload)
+            elif kind == 'done':
+                self.progress_var.set("Compression completed!")
+                self.progress_bar['value'] = 100
+                messagebox.showinfo("Success", "Compression completed successfully!")
+                return
+            elif kind == 'error':
+                self.progress_var.set("Error occurred!")
+                messagebox.showerror("Error", f"An error occurred: {payload}")
+                return
+
+        self.root.after(50, self._drain_queue)
 
     def manage_files(self, original_path: str, compressed_path: str, compression_successful: bool):
         """Manage files after compression based on success status."""
@@ -117,8 +158,7 @@ class TiffCompressorGUI:
             return original_path
 
     def compress_single_file(self, file_path):
-        self.progress_bar['value'] = 33
-        self.root.update()
+        self._queue.put(('progress', 33))
 
         compressed_path, was_already_compressed, existing_method = TiffCompressorManager.compress_file(
             file_path,
@@ -126,16 +166,15 @@ class TiffCompressorGUI:
         )
 
         self.add_result(f"File: {os.path.basename(file_path)}\n")
-        
+
         if was_already_compressed:
             self.add_result(f"Already compressed with {existing_method} - skipping\n")
             self.add_result(f"Kept file: {os.path.basename(file_path)}\n")
             self.add_result("-" * 50 + "\n")
-            self.progress_bar['value'] = 100
+            self._queue.put(('progress', 100))
             return
 
-        self.progress_bar['value'] = 66
-        self.root.update()
+        self._queue.put(('progress', 66))
 
         success = check_compression(file_path, compressed_path)
 
@@ -148,21 +187,22 @@ class TiffCompressorGUI:
         self.add_result("-" * 50 + "\n")
 
     def compress_folder(self, folder_path):
-        tiff_files = [f for f in Path(folder_path).glob("**/*.tif*")]
-        total_files = len(tiff_files)
-
-        if total_files == 0:
-            self.add_result("No TIFF files found in the selected folder.\n")
-            return
+        # Stream the enumeration instead of materializing a list of every
+        # path up front; the total is unknown, so the bar runs in
+        # indeterminate mode with a running counter in the status line.
+        processed = 0
+        self._queue.put(('mode', 'indeterminate'))
+        try:
+            for file_path in iter_tiff_files(folder_path, recursive=True):
+                processed += 1
+                self._queue.put(('status', f"Processing file {processed}"))
 
-        for i, file_path in enumerate(tiff_files, 1):
-            self.progress_bar['value'] = (i / total_files) * 100
-            self.progress_var.set(f"Processing file {i} of {total_files}")
-            self.root.update()
+                self.compress_single_file(file_path)
+        finally:
+            self._queue.put(('mode', 'determinate'))
 
-            self.compress_single_file(str(file_path))
+        if processed == 0:
+            self.add_result("No TIFF files found in the selected folder.\n")
 
     def add_result(self, text):
-        self.results_text.insert(tk.END, text)
-        self.results_text.see(tk.END)
-        self.root.update()
+        self._queue.put(('log', text))